@@ -7,6 +7,7 @@ pub struct ConstantBehaviour {
     state: Box<[LogicState]>,
     strength: OutputStrength,
     outputs: [u32; 1],
+    applied: bool,
 }
 impl ConstantBehaviour {
     #[inline]
@@ -19,6 +20,7 @@ impl ConstantBehaviour {
             state,
             strength,
             outputs: [width],
+            applied: false,
         }
     }
 
@@ -71,6 +73,11 @@ impl ComponentBehaviour for ConstantBehaviour {
         outputs: &mut [Output],
         _inputs: &[Box<[LogicState]>],
     ) -> SimulationResult<bool> {
+        if self.applied {
+            return Ok(false);
+        }
+        self.applied = true;
+
         let mut changed = outputs[0].strength != self.strength;
         outputs[0].strength = self.strength;
 
@@ -83,139 +90,177 @@ impl ComponentBehaviour for ConstantBehaviour {
     }
 }
 
-pub trait UnaryOperation: Send + Sync {
-    fn execute(value: LogicState) -> LogicState;
-}
+const STATES: [LogicState; 4] = [
+    LogicState::HighZ,
+    LogicState::Undefined,
+    LogicState::Logic0,
+    LogicState::Logic1,
+];
 
-pub trait BinaryOperation: Send + Sync {
-    fn execute(lhs: LogicState, rhs: LogicState) -> LogicState;
+#[inline]
+const fn can_be(state: LogicState, value: bool) -> bool {
+    match state {
+        LogicState::HighZ | LogicState::Undefined => true,
+        LogicState::Logic0 => !value,
+        LogicState::Logic1 => value,
+    }
 }
 
-pub struct Not;
-impl UnaryOperation for Not {
-    #[inline]
-    fn execute(value: LogicState) -> LogicState {
-        match value {
-            LogicState::Undefined => LogicState::Undefined,
-            LogicState::HighZ => LogicState::Undefined,
-            LogicState::Logic0 => LogicState::Logic1,
-            LogicState::Logic1 => LogicState::Logic0,
-        }
+#[inline]
+const fn resolve(can_be_0: bool, can_be_1: bool) -> LogicState {
+    match (can_be_0, can_be_1) {
+        (true, false) => LogicState::Logic0,
+        (false, true) => LogicState::Logic1,
+        _ => LogicState::Undefined,
     }
 }
 
-pub struct And;
-impl BinaryOperation for And {
-    #[inline]
-    fn execute(lhs: LogicState, rhs: LogicState) -> LogicState {
-        match (lhs, rhs) {
-            (LogicState::Logic0, _) => LogicState::Logic0,
-            (_, LogicState::Logic0) => LogicState::Logic0,
+// Extends a boolean truth table to all logic states: the result is only defined
+// if every possible interpretation of undefined or floating inputs agrees on it
+const fn unary_table(f: [bool; 2]) -> [LogicState; 4] {
+    let mut table = [LogicState::Undefined; 4];
+
+    let mut i = 0;
+    while i < 4 {
+        let mut can_be_0 = false;
+        let mut can_be_1 = false;
+
+        let mut v = 0;
+        while v < 2 {
+            if can_be(STATES[i], v == 1) {
+                can_be_0 |= !f[v];
+                can_be_1 |= f[v];
+            }
+            v += 1;
+        }
+
+        table[i] = resolve(can_be_0, can_be_1);
+        i += 1;
+    }
 
-            (LogicState::Undefined, _) => LogicState::Undefined,
-            (_, LogicState::Undefined) => LogicState::Undefined,
+    table
+}
 
-            (LogicState::HighZ, _) => LogicState::Undefined,
-            (_, LogicState::HighZ) => LogicState::Undefined,
+const fn binary_table(f: [[bool; 2]; 2]) -> [[LogicState; 4]; 4] {
+    let mut table = [[LogicState::Undefined; 4]; 4];
+
+    let mut i = 0;
+    while i < 4 {
+        let mut j = 0;
+        while j < 4 {
+            let mut can_be_0 = false;
+            let mut can_be_1 = false;
+
+            let mut lhs = 0;
+            while lhs < 2 {
+                let mut rhs = 0;
+                while rhs < 2 {
+                    if can_be(STATES[i], lhs == 1) && can_be(STATES[j], rhs == 1) {
+                        can_be_0 |= !f[lhs][rhs];
+                        can_be_1 |= f[lhs][rhs];
+                    }
+                    rhs += 1;
+                }
+                lhs += 1;
+            }
 
-            (LogicState::Logic1, LogicState::Logic1) => LogicState::Logic1,
+            table[i][j] = resolve(can_be_0, can_be_1);
+            j += 1;
         }
+        i += 1;
     }
+
+    table
 }
 
-pub struct Nand;
-impl BinaryOperation for Nand {
-    #[inline]
-    fn execute(lhs: LogicState, rhs: LogicState) -> LogicState {
-        match (lhs, rhs) {
-            (LogicState::Logic0, _) => LogicState::Logic1,
-            (_, LogicState::Logic0) => LogicState::Logic1,
+// Packs a truth table into 2 bits per entry, so a lookup becomes a shift and a mask
+// that can be vectorized across lanes instead of a memory access per lane
+const fn pack_unary_table(table: [LogicState; 4]) -> u32 {
+    let mut packed = 0;
 
-            (LogicState::Undefined, _) => LogicState::Undefined,
-            (_, LogicState::Undefined) => LogicState::Undefined,
+    let mut i = 0;
+    while i < 4 {
+        packed |= (table[i] as u32) << (i * 2);
+        i += 1;
+    }
 
-            (LogicState::HighZ, _) => LogicState::Undefined,
-            (_, LogicState::HighZ) => LogicState::Undefined,
+    packed
+}
 
-            (LogicState::Logic1, LogicState::Logic1) => LogicState::Logic0,
+const fn pack_binary_table(table: [[LogicState; 4]; 4]) -> u32 {
+    let mut packed = 0;
+
+    let mut i = 0;
+    while i < 4 {
+        let mut j = 0;
+        while j < 4 {
+            packed |= (table[i][j] as u32) << ((i * 4 + j) * 2);
+            j += 1;
         }
+        i += 1;
     }
-}
 
-pub struct Or;
-impl BinaryOperation for Or {
-    #[inline]
-    fn execute(lhs: LogicState, rhs: LogicState) -> LogicState {
-        match (lhs, rhs) {
-            (LogicState::Logic1, _) => LogicState::Logic1,
-            (_, LogicState::Logic1) => LogicState::Logic1,
-
-            (LogicState::Undefined, _) => LogicState::Undefined,
-            (_, LogicState::Undefined) => LogicState::Undefined,
+    packed
+}
 
-            (LogicState::HighZ, _) => LogicState::Undefined,
-            (_, LogicState::HighZ) => LogicState::Undefined,
+// Truth tables are indexed in `LogicState` order: Z, X, 0, 1
+pub trait UnaryOperation: Send + Sync {
+    const TABLE: [LogicState; 4];
+    const PACKED_TABLE: u32 = pack_unary_table(Self::TABLE);
 
-            (LogicState::Logic0, LogicState::Logic0) => LogicState::Logic0,
-        }
+    #[inline]
+    fn execute(value: LogicState) -> LogicState {
+        let shift = (value as u32) << 1;
+        let state = (Self::PACKED_TABLE >> shift) & 0b11;
+        unsafe { std::mem::transmute(state) }
     }
 }
 
-pub struct Nor;
-impl BinaryOperation for Nor {
+pub trait BinaryOperation: Send + Sync {
+    const TABLE: [[LogicState; 4]; 4];
+    const PACKED_TABLE: u32 = pack_binary_table(Self::TABLE);
+
     #[inline]
     fn execute(lhs: LogicState, rhs: LogicState) -> LogicState {
-        match (lhs, rhs) {
-            (LogicState::Logic1, _) => LogicState::Logic0,
-            (_, LogicState::Logic1) => LogicState::Logic0,
+        let shift = (((lhs as u32) << 2) | (rhs as u32)) << 1;
+        let state = (Self::PACKED_TABLE >> shift) & 0b11;
+        unsafe { std::mem::transmute(state) }
+    }
+}
 
-            (LogicState::Undefined, _) => LogicState::Undefined,
-            (_, LogicState::Undefined) => LogicState::Undefined,
+pub struct Not;
+impl UnaryOperation for Not {
+    const TABLE: [LogicState; 4] = unary_table([true, false]);
+}
 
-            (LogicState::HighZ, _) => LogicState::Undefined,
-            (_, LogicState::HighZ) => LogicState::Undefined,
+pub struct And;
+impl BinaryOperation for And {
+    const TABLE: [[LogicState; 4]; 4] = binary_table([[false, false], [false, true]]);
+}
 
-            (LogicState::Logic0, LogicState::Logic0) => LogicState::Logic1,
-        }
-    }
+pub struct Nand;
+impl BinaryOperation for Nand {
+    const TABLE: [[LogicState; 4]; 4] = binary_table([[true, true], [true, false]]);
 }
 
-pub struct Xor;
-impl BinaryOperation for Xor {
-    #[inline]
-    fn execute(lhs: LogicState, rhs: LogicState) -> LogicState {
-        match (lhs, rhs) {
-            (LogicState::Undefined, _) => LogicState::Undefined,
-            (_, LogicState::Undefined) => LogicState::Undefined,
+pub struct Or;
+impl BinaryOperation for Or {
+    const TABLE: [[LogicState; 4]; 4] = binary_table([[false, true], [true, true]]);
+}
 
-            (LogicState::HighZ, _) => LogicState::Undefined,
-            (_, LogicState::HighZ) => LogicState::Undefined,
+pub struct Nor;
+impl BinaryOperation for Nor {
+    const TABLE: [[LogicState; 4]; 4] = binary_table([[true, false], [false, false]]);
+}
 
-            (LogicState::Logic0, LogicState::Logic0) => LogicState::Logic0,
-            (LogicState::Logic0, LogicState::Logic1) => LogicState::Logic1,
-            (LogicState::Logic1, LogicState::Logic0) => LogicState::Logic1,
-            (LogicState::Logic1, LogicState::Logic1) => LogicState::Logic0,
-        }
-    }
+pub struct Xor;
+impl BinaryOperation for Xor {
+    const TABLE: [[LogicState; 4]; 4] = binary_table([[false, true], [true, false]]);
 }
 
 pub struct Xnor;
 impl BinaryOperation for Xnor {
-    #[inline]
-    fn execute(lhs: LogicState, rhs: LogicState) -> LogicState {
-        match (lhs, rhs) {
-            (LogicState::Undefined, _) => LogicState::Undefined,
-            (_, LogicState::Undefined) => LogicState::Undefined,
-
-            (LogicState::HighZ, _) => LogicState::Undefined,
-            (_, LogicState::HighZ) => LogicState::Undefined,
-
-            (LogicState::Logic0, LogicState::Logic0) => LogicState::Logic1,
-            (LogicState::Logic0, LogicState::Logic1) => LogicState::Logic0,
-            (LogicState::Logic1, LogicState::Logic0) => LogicState::Logic0,
-            (LogicState::Logic1, LogicState::Logic1) => LogicState::Logic1,
-        }
-    }
+    const TABLE: [[LogicState; 4]; 4] = binary_table([[true, false], [false, true]]);
 }
 
 pub struct UnaryBehaviour<Op: UnaryOperation> {
@@ -263,9 +308,75 @@ impl<Op: UnaryOperation> ComponentBehaviour for UnaryBehaviour<Op> {
     }
 }
 
+#[inline(always)]
+fn execute_lanes_generic<Op: BinaryOperation>(
+    states: &mut [LogicState],
+    lhs: &[LogicState],
+    rhs: &[LogicState],
+) -> bool {
+    let mut changed = false;
+
+    let lanes = states.iter_mut().zip(lhs.iter()).zip(rhs.iter());
+    for ((state, lhs), rhs) in lanes {
+        let new_state = Op::execute(*lhs, *rhs);
+
+        changed |= new_state != *state;
+        *state = new_state;
+    }
+
+    changed
+}
+
+#[cfg(any(target_arch = "x86", target_arch = "x86_64"))]
+#[target_feature(enable = "avx512f")]
+unsafe fn execute_lanes_avx512<Op: BinaryOperation>(
+    states: &mut [LogicState],
+    lhs: &[LogicState],
+    rhs: &[LogicState],
+) -> bool {
+    execute_lanes_generic::<Op>(states, lhs, rhs)
+}
+
+#[cfg(any(target_arch = "x86", target_arch = "x86_64"))]
+#[target_feature(enable = "avx2")]
+unsafe fn execute_lanes_avx2<Op: BinaryOperation>(
+    states: &mut [LogicState],
+    lhs: &[LogicState],
+    rhs: &[LogicState],
+) -> bool {
+    execute_lanes_generic::<Op>(states, lhs, rhs)
+}
+
+type ExecuteLanes = unsafe fn(&mut [LogicState], &[LogicState], &[LogicState]) -> bool;
+
+// Narrower gates don't fill a single vector, so calling out of line doesn't pay off for them
+const MIN_VECTOR_WIDTH: u32 = 16;
+
+// The packed table lookup needs per-lane variable shifts, which only vectorize well
+// with AVX2 and AVX-512, so those are selected once if the CPU supports them
+fn select_execute_lanes<Op: BinaryOperation>(width: u32) -> Option<ExecuteLanes> {
+    if width < MIN_VECTOR_WIDTH {
+        return None;
+    }
+
+    #[cfg(any(target_arch = "x86", target_arch = "x86_64"))]
+    {
+        if is_x86_feature_detected!("avx512f") {
+            return Some(execute_lanes_avx512::<Op>);
+        }
+
+        if is_x86_feature_detected!("avx2") {
+            return Some(execute_lanes_avx2::<Op>);
+        }
+    }
+
+    None
+}
+
 pub struct BinaryBehaviour<Op: BinaryOperation> {
     outputs: [u32; 1],
     inputs: Box<[u32]>,
+    execute_lanes: Option<ExecuteLanes>,
     _op: PhantomData<Op>,
 }
 impl<Op: BinaryOperation> BinaryBehaviour<Op> {
@@ -279,6 +390,7 @@ impl<Op: BinaryOperation> BinaryBehaviour<Op> {
         Self {
             outputs: [width],
             inputs,
+            execute_lanes: select_execute_lanes::<Op>(width),
             _op: PhantomData,
         }
     }
@@ -300,14 +412,23 @@ impl<Op: BinaryOperation> ComponentBehaviour for BinaryBehaviour<Op> {
         let mut changed = outputs[0].strength != OutputStrength::Strong;
         outputs[0].strength = OutputStrength::Strong;
 
-        for (i, state) in outputs[0].state.iter_mut().enumerate() {
-            let mut new_state = inputs[0][i];
-            for input in inputs.iter().skip(1) {
-                new_state = Op::execute(new_state, input[i]);
+        if let [lhs, rhs] = inputs {
+            let states = &mut outputs[0].state;
+            changed |= match self.execute_lanes {
+                // Only selected if the CPU supports the target features it was compiled for
+                Some(execute_lanes) => unsafe { execute_lanes(states, lhs, rhs) },
+                None => execute_lanes_generic::<Op>(states, lhs, rhs),
+            };
+        } else {
+            for (i, state) in outputs[0].state.iter_mut().enumerate() {
+                let mut new_state = inputs[0][i];
+                for input in inputs.iter().skip(1) {
+                    new_state = Op::execute(new_state, input[i]);
+                }
+
+                changed |= new_state != *state;
+                *state = new_state;
             }
-
-            changed |= new_state != *state;
-            *state = new_state;
         }
 
         Ok(changed)
@@ -368,6 +489,22 @@ impl InputPin {
 
         self.changed.store(true, Ordering::Relaxed);
     }
+
+    pub fn set_packed(&self, values: &[u32], valid: &[u32]) {
+        fn get_bit(words: &[u32], index: usize) -> bool {
+            let word = words.get(index / 32).copied().unwrap_or(0);
+            ((word >> (index % 32)) & 1) > 0
+        }
+
+        for (i, s) in self.state.iter().enumerate() {
+            s.store(
+                LogicState::from_bits(get_bit(values, i), get_bit(valid, i)),
+                Ordering::Relaxed,
+            );
+        }
+
+        self.changed.store(true, Ordering::Relaxed);
+    }
 }
 
 pub struct InputPinBehaviour {
@@ -433,6 +570,23 @@ impl OutputPin {
                 .unwrap_or(LogicState::HighZ);
         }
     }
+
+    pub fn get_packed(&self, values: &mut [u32], valid: &mut [u32]) {
+        values.fill(0);
+        valid.fill(0);
+
+        for (i, s) in self.state.iter().enumerate() {
+            let word_index = i / 32;
+            let bit_index = i % 32;
+            if (word_index >= values.len()) || (word_index >= valid.len()) {
+                break;
+            }
+
+            let state = s.load(Ordering::Relaxed);
+            values[word_index] |= state.value_bit() << bit_index;
+            valid[word_index] |= state.valid_bit() << bit_index;
+        }
+    }
 }
 
 pub struct OutputPinBehaviour {
@@ -467,3 +621,75 @@ impl ComponentBehaviour for OutputPinBehaviour {
         Ok(false)
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    const X: LogicState = LogicState::Undefined;
+    const L0: LogicState = LogicState::Logic0;
+    const L1: LogicState = LogicState::Logic1;
+
+    #[test]
+    fn unary_tables() {
+        assert_eq!(<Not as UnaryOperation>::TABLE, [X, X, L1, L0]);
+    }
+
+    #[test]
+    fn binary_tables() {
+        assert_eq!(
+            <And as BinaryOperation>::TABLE,
+            [
+                [X, X, L0, X],    // Z
+                [X, X, L0, X],    // X
+                [L0, L0, L0, L0], // 0
+                [X, X, L0, L1],   // 1
+            ]
+        );
+        assert_eq!(
+            <Nand as BinaryOperation>::TABLE,
+            [
+                [X, X, L1, X],    // Z
+                [X, X, L1, X],    // X
+                [L1, L1, L1, L1], // 0
+                [X, X, L1, L0],   // 1
+            ]
+        );
+        assert_eq!(
+            <Or as BinaryOperation>::TABLE,
+            [
+                [X, X, X, L1],    // Z
+                [X, X, X, L1],    // X
+                [X, X, L0, L1],   // 0
+                [L1, L1, L1, L1], // 1
+            ]
+        );
+        assert_eq!(
+            <Nor as BinaryOperation>::TABLE,
+            [
+                [X, X, X, L0],    // Z
+                [X, X, X, L0],    // X
+                [X, X, L1, L0],   // 0
+                [L0, L0, L0, L0], // 1
+            ]
+        );
+        assert_eq!(
+            <Xor as BinaryOperation>::TABLE,
+            [
+                [X, X, X, X],   // Z
+                [X, X, X, X],   // X
+                [X, X, L0, L1], // 0
+                [X, X, L1, L0], // 1
+            ]
+        );
+        assert_eq!(
+            <Xnor as BinaryOperation>::TABLE,
+            [
+                [X, X, X, X],   // Z
+                [X, X, X, X],   // X
+                [X, X, L1, L0], // 0
+                [X, X, L0, L1], // 1
+            ]
+        );
+    }
+}
@@ -59,6 +59,7 @@ pub enum Result {
     Success = 0,
     DriverAlreadyPresent = 1,
     DriverNotPresent = 2,
+    MaxStepsReached = 3,
 
     NullPointerError = -1,
     InvalidComponentIdError = -2,
@@ -67,6 +68,18 @@ pub enum Result {
     InvalidOutputIndexError = -5,
     ConflictError = -6,
     InvalidLogicStateError = -7,
+    InvalidArgumentError = -8,
+}
+impl From<SimulationError> for Result {
+    #[inline]
+    fn from(err: SimulationError) -> Self {
+        match err {
+            SimulationError::Conflict => Result::ConflictError,
+            SimulationError::InvalidComponentId => Result::InvalidComponentIdError,
+            SimulationError::InvalidWireId => Result::InvalidWireIdError,
+            SimulationError::InvalidOutputIndex => Result::InvalidOutputIndexError,
+        }
+    }
 }
 
 pub struct FfiSimulator {
@@ -83,6 +96,15 @@ impl FfiSimulator {
             output_pins: AHashMap::new(),
         }
     }
+
+    #[inline]
+    fn with_capacity(component_capacity: usize, wire_capacity: usize) -> Self {
+        Self {
+            simulator: Simulator::with_capacity(component_capacity, wire_capacity),
+            input_pins: AHashMap::new(),
+            output_pins: AHashMap::new(),
+        }
+    }
 }
 
 #[no_mangle]
@@ -97,6 +119,25 @@ pub unsafe extern "cdecl" fn simulator_create(out_simulator: *mut *mut FfiSimula
     Result::Success
 }
 
+#[no_mangle]
+pub unsafe extern "cdecl" fn simulator_create_with_capacity(
+    component_capacity: u32,
+    wire_capacity: u32,
+    out_simulator: *mut *mut FfiSimulator,
+) -> Result {
+    if out_simulator.is_null() {
+        return Result::NullPointerError;
+    }
+
+    let simulator = Box::new(FfiSimulator::with_capacity(
+        component_capacity as usize,
+        wire_capacity as usize,
+    ));
+    let ptr = Box::into_raw(simulator);
+    (*out_simulator) = ptr;
+    Result::Success
+}
+
 #[no_mangle]
 pub unsafe extern "cdecl" fn simulator_destroy(simulator: *mut FfiSimulator) -> Result {
     if simulator.is_null() {
@@ -108,6 +149,18 @@ pub unsafe extern "cdecl" fn simulator_destroy(simulator: *mut FfiSimulator) ->
     Result::Success
 }
 
+#[no_mangle]
+pub unsafe extern "cdecl" fn simulator_clear(simulator: *mut FfiSimulator) -> Result {
+    if simulator.is_null() {
+        return Result::NullPointerError;
+    }
+
+    (*simulator).simulator.clear();
+    (*simulator).input_pins.clear();
+    (*simulator).output_pins.clear();
+    Result::Success
+}
+
 #[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
 #[repr(transparent)]
 pub struct ComponentKind(u32);
@@ -311,13 +364,192 @@ pub unsafe extern "cdecl" fn simulator_step(
             (*out_changed) = changed.into();
             Result::Success
         }
-        Err(err) => match err {
-            SimulationError::Conflict => Result::ConflictError,
-            SimulationError::InvalidComponentId => Result::InvalidComponentIdError,
-            SimulationError::InvalidWireId => Result::InvalidWireIdError,
-            SimulationError::InvalidOutputIndex => Result::InvalidOutputIndexError,
+        Err(err) => err.into(),
+    }
+}
+
+// Returns `Success` once the circuit is stable, `MaxStepsReached` if it is still changing
+// after `max_steps` steps and `InvalidArgumentError` if `max_steps` is 0
+#[no_mangle]
+pub unsafe extern "cdecl" fn simulator_run(simulator: *mut FfiSimulator, max_steps: u32) -> Result {
+    if simulator.is_null() {
+        return Result::NullPointerError;
+    }
+
+    if max_steps == 0 {
+        return Result::InvalidArgumentError;
+    }
+
+    match (*simulator).simulator.run(max_steps) {
+        Ok(false) => Result::Success,
+        Ok(true) => Result::MaxStepsReached,
+        Err(err) => err.into(),
+    }
+}
+
+fn run_vectors(
+    simulator: &mut FfiSimulator,
+    input_a: ComponentId,
+    input_b: ComponentId,
+    output: ComponentId,
+    vector_count: usize,
+    max_steps: u32,
+    check_inputs: impl FnOnce(&InputPin, &InputPin) -> Result,
+    mut set_inputs: impl FnMut(usize, &InputPin, &InputPin),
+    mut get_output: impl FnMut(usize, &OutputPin),
+) -> Result {
+    if max_steps == 0 {
+        return Result::InvalidArgumentError;
+    }
+
+    let (pin_a, pin_b, pin_out) = match (
+        simulator.input_pins.get(&input_a),
+        simulator.input_pins.get(&input_b),
+        simulator.output_pins.get(&output),
+    ) {
+        (Some(pin_a), Some(pin_b), Some(pin_out)) => (pin_a, pin_b, pin_out),
+        _ => return Result::InvalidComponentIdError,
+    };
+
+    let result = check_inputs(pin_a, pin_b);
+    if result != Result::Success {
+        return result;
+    }
+
+    let mut result = Result::Success;
+    for i in 0..vector_count {
+        set_inputs(i, pin_a, pin_b);
+
+        match simulator.simulator.run(max_steps) {
+            Ok(false) => {}
+            Ok(true) => result = Result::MaxStepsReached,
+            Err(err) => return err.into(),
+        }
+
+        get_output(i, pin_out);
+    }
+
+    result
+}
+
+// Same result codes as `simulator_run`, `MaxStepsReached` is returned if any row did not settle
+#[no_mangle]
+pub unsafe extern "cdecl" fn simulator_run_vector(
+    simulator: *mut FfiSimulator,
+    input_a: ComponentId,
+    input_b: ComponentId,
+    output: ComponentId,
+    vector_count: u32,
+    states_a: *const u32,
+    states_b: *const u32,
+    out_states: *mut LogicState,
+    max_steps: u32,
+) -> Result {
+    if simulator.is_null() || states_a.is_null() || states_b.is_null() || out_states.is_null() {
+        return Result::NullPointerError;
+    }
+
+    let vector_count = vector_count as usize;
+    run_vectors(
+        &mut *simulator,
+        input_a,
+        input_b,
+        output,
+        vector_count,
+        max_steps,
+        |pin_a, pin_b| {
+            let states_a =
+                std::slice::from_raw_parts(states_a, vector_count * (pin_a.width() as usize));
+            let states_b =
+                std::slice::from_raw_parts(states_b, vector_count * (pin_b.width() as usize));
+            for s in states_a.iter().chain(states_b.iter()).copied() {
+                if !LogicState::is_valid(s) {
+                    return Result::InvalidLogicStateError;
+                }
+            }
+
+            Result::Success
+        },
+        |i, pin_a, pin_b| {
+            let width_a = pin_a.width() as usize;
+            let width_b = pin_b.width() as usize;
+            let states_a = states_a.add(i * width_a) as *const LogicState;
+            let states_b = states_b.add(i * width_b) as *const LogicState;
+
+            pin_a.set(std::slice::from_raw_parts(states_a, width_a));
+            pin_b.set(std::slice::from_raw_parts(states_b, width_b));
+        },
+        |i, pin_out| {
+            let width = pin_out.width() as usize;
+            pin_out.get(std::slice::from_raw_parts_mut(
+                out_states.add(i * width),
+                width,
+            ));
         },
+    )
+}
+
+#[inline]
+fn word_count(width: u32) -> usize {
+    ((width as usize) + 31) / 32
+}
+
+// Same result codes as `simulator_run_vector`
+#[no_mangle]
+pub unsafe extern "cdecl" fn simulator_run_vector_packed(
+    simulator: *mut FfiSimulator,
+    input_a: ComponentId,
+    input_b: ComponentId,
+    output: ComponentId,
+    vector_count: u32,
+    values_a: *const u32,
+    valid_a: *const u32,
+    values_b: *const u32,
+    valid_b: *const u32,
+    out_values: *mut u32,
+    out_valid: *mut u32,
+    max_steps: u32,
+) -> Result {
+    if simulator.is_null()
+        || values_a.is_null()
+        || valid_a.is_null()
+        || values_b.is_null()
+        || valid_b.is_null()
+        || out_values.is_null()
+        || out_valid.is_null()
+    {
+        return Result::NullPointerError;
     }
+
+    run_vectors(
+        &mut *simulator,
+        input_a,
+        input_b,
+        output,
+        vector_count as usize,
+        max_steps,
+        |_, _| Result::Success,
+        |i, pin_a, pin_b| {
+            let words_a = word_count(pin_a.width());
+            let words_b = word_count(pin_b.width());
+
+            pin_a.set_packed(
+                std::slice::from_raw_parts(values_a.add(i * words_a), words_a),
+                std::slice::from_raw_parts(valid_a.add(i * words_a), words_a),
+            );
+            pin_b.set_packed(
+                std::slice::from_raw_parts(values_b.add(i * words_b), words_b),
+                std::slice::from_raw_parts(valid_b.add(i * words_b), words_b),
+            );
+        },
+        |i, pin_out| {
+            let words = word_count(pin_out.width());
+            pin_out.get_packed(
+                std::slice::from_raw_parts_mut(out_values.add(i * words), words),
+                std::slice::from_raw_parts_mut(out_valid.add(i * words), words),
+            );
+        },
+    )
 }
 
 #[no_mangle]
@@ -386,6 +618,28 @@ pub unsafe extern "cdecl" fn input_pin_set(
     }
 }
 
+#[no_mangle]
+pub unsafe extern "cdecl" fn input_pin_set_packed(
+    simulator: *mut FfiSimulator,
+    component_id: ComponentId,
+    word_count: u32,
+    values: *const u32,
+    valid: *const u32,
+) -> Result {
+    if simulator.is_null() || values.is_null() || valid.is_null() {
+        return Result::NullPointerError;
+    }
+
+    if let Some(pin) = (*simulator).input_pins.get(&component_id) {
+        let values = std::slice::from_raw_parts(values, word_count as usize);
+        let valid = std::slice::from_raw_parts(valid, word_count as usize);
+        pin.set_packed(values, valid);
+        Result::Success
+    } else {
+        Result::InvalidComponentIdError
+    }
+}
+
 #[no_mangle]
 pub unsafe extern "cdecl" fn output_pin_get(
     simulator: *mut FfiSimulator,
@@ -406,6 +660,28 @@ pub unsafe extern "cdecl" fn output_pin_get(
     }
 }
 
+#[no_mangle]
+pub unsafe extern "cdecl" fn output_pin_get_packed(
+    simulator: *mut FfiSimulator,
+    component_id: ComponentId,
+    word_count: u32,
+    values: *mut u32,
+    valid: *mut u32,
+) -> Result {
+    if simulator.is_null() || values.is_null() || valid.is_null() {
+        return Result::NullPointerError;
+    }
+
+    if let Some(pin) = (*simulator).output_pins.get(&component_id) {
+        let values = std::slice::from_raw_parts_mut(values, word_count as usize);
+        let valid = std::slice::from_raw_parts_mut(valid, word_count as usize);
+        pin.get_packed(values, valid);
+        Result::Success
+    } else {
+        Result::InvalidComponentIdError
+    }
+}
+
 #[no_mangle]
 pub unsafe extern "cdecl" fn wire_get_state(
     simulator: *mut FfiSimulator,
@@ -1,5 +1,6 @@
 #![feature(const_trait_impl)]
 #![feature(box_into_inner)]
+#![feature(avx512_target_feature)]
 
 pub mod components;
 pub mod ffi;
@@ -46,6 +47,26 @@ impl LogicState {
     const fn is_valid(v: u32) -> bool {
         v <= 3
     }
+
+    #[inline]
+    const fn from_bits(value: bool, valid: bool) -> Self {
+        match (valid, value) {
+            (false, false) => Self::HighZ,
+            (false, true) => Self::Undefined,
+            (true, false) => Self::Logic0,
+            (true, true) => Self::Logic1,
+        }
+    }
+
+    #[inline]
+    const fn value_bit(self) -> u32 {
+        (self as u32) & 1
+    }
+
+    #[inline]
+    const fn valid_bit(self) -> u32 {
+        ((self as u32) >> 1) & 1
+    }
 }
 impl const Default for LogicState {
     #[inline]
@@ -64,7 +85,7 @@ pub enum OutputStrength {
 #[derive(Debug, Clone)]
 #[repr(C)]
 pub struct Output {
-    state: Vec<LogicState>,
+    state: Box<[LogicState]>,
     pub strength: OutputStrength,
 }
 impl Output {
@@ -80,7 +101,7 @@ impl Output {
 }
 
 struct Input {
-    wires: Vec<Option<WireId>>,
+    wires: Box<[Option<WireId>]>,
 }
 
 pub trait ComponentBehaviour: Send + Sync {
@@ -106,7 +127,7 @@ impl Component {
         let mut outputs = Vec::with_capacity(output_config.len());
         for width in output_config.iter().copied() {
             outputs.push(Output {
-                state: vec![LogicState::Undefined; width as usize],
+                state: vec![LogicState::Undefined; width as usize].into_boxed_slice(),
                 strength: OutputStrength::Weak,
             })
         }
@@ -116,7 +137,7 @@ impl Component {
         let mut input_values = Vec::with_capacity(input_config.len());
         for width in input_config.iter().copied() {
             inputs.push(Input {
-                wires: vec![None; width as usize],
+                wires: vec![None; width as usize].into_boxed_slice(),
             });
 
             input_values.push(vec![LogicState::HighZ; width as usize].into_boxed_slice());
@@ -280,6 +301,21 @@ impl Simulator {
         }
     }
 
+    pub fn with_capacity(component_capacity: usize, wire_capacity: usize) -> Self {
+        Self {
+            next_component_id: ComponentId(0),
+            components: AHashMap::with_capacity(component_capacity),
+            next_wire_id: WireId(0),
+            wires: AHashMap::with_capacity(wire_capacity),
+        }
+    }
+
+    // IDs are not reused after clearing so stale IDs of the previous circuit stay invalid
+    pub fn clear(&mut self) {
+        self.components.clear();
+        self.wires.clear();
+    }
+
     pub fn add_component(&mut self, component: Component) -> ComponentId {
         let id = self.next_component_id;
         self.next_component_id.0 += 1;
@@ -358,4 +394,18 @@ impl Simulator {
 
         Ok(wires_changed | components_changed)
     }
+
+    // Returns whether the circuit was still changing after `max_steps` steps,
+    // so `max_steps` has to be at least 1 for the result to be meaningful
+    pub fn run(&mut self, max_steps: u32) -> SimulationResult<bool> {
+        debug_assert!(max_steps > 0);
+
+        for _ in 0..max_steps {
+            if !self.step()? {
+                return Ok(false);
+            }
+        }
+
+        Ok(true)
+    }
 }